@@ -1,8 +1,12 @@
 # app/db.py
 from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+import itertools
 import os
+import threading
+import time
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -28,25 +32,151 @@ def get_database_url():
 
 DATABASE_URL = get_database_url()
 
+# Comma-separated read replicas, e.g. postgresql+psycopg2://…@replica-1/db,…
+REPLICA_DATABASE_URLS = [u.strip() for u in os.getenv("REPLICA_DATABASE_URLS", "").split(",") if u.strip()]
+REPLICA_STICKY_SECONDS = float(os.getenv("REPLICA_STICKY_SECONDS", "5"))  # read-your-writes window
+REPLICA_RETRY_SECONDS = float(os.getenv("REPLICA_RETRY_SECONDS", "30"))   # how long a failed replica sits out
+
 from sqlalchemy.pool import QueuePool
 
-engine = create_engine(
-    DATABASE_URL,
-    poolclass=QueuePool,
-    pool_size=5,          # number of persistent connections
-    max_overflow=10,      # extra connections for bursts
-    pool_timeout=30,
-    pool_recycle=1800,    # reconnect every 30 mins
-    connect_args={"sslmode": "require"},
-)
-
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def make_engine(url: str, **kwargs):
+    return create_engine(
+        url,
+        poolclass=QueuePool,
+        pool_size=5,          # number of persistent connections
+        max_overflow=10,      # extra connections for bursts
+        pool_timeout=30,
+        pool_recycle=1800,    # reconnect every 30 mins
+        connect_args={"sslmode": "require"},
+        **kwargs,
+    )
+
+
+# The engine (and the psycopg2 import behind it) is built on first use or by
+# warm_up() at startup, not at import time.
+_engine = None
+_engine_lock = threading.Lock()
+_Session = sessionmaker(autocommit=False, autoflush=False)
 Base = declarative_base()
 
 
+def get_engine():
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = make_engine(DATABASE_URL)
+                _Session.configure(bind=_engine)
+    return _engine
+
+
+def SessionLocal():
+    get_engine()
+    return _Session()
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+# ---------------------------
+# Read replicas
+# ---------------------------
+class Replica:
+    def __init__(self, url: str):
+        self.url = url
+        self._engine = None
+        self._Session = sessionmaker(autocommit=False, autoflush=False)
+        self.down_until = 0.0
+
+    def _ensure_engine(self):
+        """Build the engine (and bind the session factory) on first use."""
+        if self._engine is None:
+            with _engine_lock:
+                if self._engine is None:
+                    # pre-ping so dead connections surface at checkout
+                    self._engine = make_engine(self.url, pool_pre_ping=True)
+                    self._Session.configure(bind=self._engine)
+        return self._engine
+
+    @property
+    def engine(self):
+        return self._ensure_engine()
+
+    def session(self):
+        self._ensure_engine()
+        return self._Session()
+
+    def mark_down(self, error):
+        print(f"⚠️ Read replica unavailable ({error}), routing reads to primary")
+        self.down_until = time.monotonic() + REPLICA_RETRY_SECONDS
+
+
+replicas = [Replica(url) for url in REPLICA_DATABASE_URLS]
+_next_replica = itertools.count()
+
+
+def pick_replica():
+    """Round-robin over replicas that aren't sitting out a failure."""
+    now = time.monotonic()
+    start = next(_next_replica)
+    for i in range(len(replicas)):
+        replica = replicas[(start + i) % len(replicas)]
+        if replica.down_until <= now:
+            return replica
+    return None
+
+
+def replica_session():
+    """(replica, session) on a healthy replica, or (None, None) to use the primary."""
+    replica = pick_replica()
+    if replica is None:
+        return None, None
+    db = replica.session()
+    try:
+        db.connection()  # check out now so a dead replica fails over before the query
+    except OperationalError as e:
+        db.close()
+        replica.mark_down(e)
+        return None, None
+    return replica, db
+
+
+def read_session():
+    """Session for reads outside a request (e.g. WS snapshots); caller closes it."""
+    _, db = replica_session()
+    return db or SessionLocal()
+
+
+# ---------------------------
+# Startup / shutdown
+# ---------------------------
+def warm_up(connections: int = 2):
+    """Open pool connections ahead of the first request (blocking; run in a thread)."""
+    opened = [get_engine().connect() for _ in range(connections)]
+    for conn in opened:
+        conn.close()  # back to the pool, still open
+
+    for replica in replicas:
+        try:
+            replica.engine.connect().close()
+        except OperationalError as e:
+            replica.mark_down(e)
+
+
+def ping():
+    with get_engine().connect() as conn:
+        conn.exec_driver_sql("SELECT 1")
+
+
+def dispose_engines():
+    if _engine is not None:
+        _engine.dispose()
+    for replica in replicas:
+        if replica._engine is not None:
+            replica._engine.dispose()
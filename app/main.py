@@ -1,11 +1,75 @@
 # app/main.py
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 
+from app import db
 from app.routes import polls, votes, likes, auth, polls_ws
+from app.utils.redis_client import redis_manager
+
+STARTUP_WARM_CONNECTIONS = int(os.getenv("STARTUP_WARM_CONNECTIONS", "2"))
+STARTUP_BLOCKING = os.getenv("STARTUP_BLOCKING", "0") == "1"  # wait for warm-up before serving
+READY_CACHE_SECONDS = float(os.getenv("READY_CACHE_SECONDS", "2"))  # reuse a DB check this long
+READY_PING_TIMEOUT = float(os.getenv("READY_PING_TIMEOUT", "2"))
+
+startup_state = {"ready": False, "db": None, "redis": None, "warmup_seconds": None}
+_db_checked_at = 0.0
+_db_check_lock = asyncio.Lock()
+
+
+# ---------------------------
+# Startup warm-up
+# ---------------------------
+async def _warm_db():
+    try:
+        await asyncio.to_thread(db.warm_up, STARTUP_WARM_CONNECTIONS)
+        return "ok"
+    except Exception as e:
+        print(f"⚠️ DB warm-up failed ({e})")
+        return "error"
+
+
+async def _warm_redis():
+    if redis_manager.state == "disabled":
+        return "disabled"
+    return "ok" if await redis_manager.probe() else "unavailable"
+
+
+async def warm_up():
+    """Open the DB pool and the Redis connection concurrently."""
+    started = time.perf_counter()
+    db_status, redis_status = await asyncio.gather(_warm_db(), _warm_redis())
+    startup_state.update(
+        ready=db_status == "ok",
+        db=db_status,
+        redis=redis_status,
+        warmup_seconds=round(time.perf_counter() - started, 3),
+    )
+    print(f"🔥 Warm-up done in {startup_state['warmup_seconds']}s (db={db_status}, redis={redis_status})")
 
-app = FastAPI(title="QuickPoll Backend")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if STARTUP_BLOCKING:
+        await warm_up()
+        task = None
+    else:
+        # Serve (and answer liveness probes) while warming up
+        task = asyncio.create_task(warm_up())
+    yield
+    if task:
+        task.cancel()
+    await redis_manager.close()
+    db.dispose_engines()
+
+
+app = FastAPI(title="QuickPoll Backend", lifespan=lifespan)
 
 # Register routers
 app.include_router(polls.router, prefix="/api/polls", tags=["Polls"])
@@ -30,3 +94,39 @@ def root():
     return {"message": "QuickPoll API is running 🚀"}
 
 
+@app.get("/health/live")
+def liveness():
+    return {"status": "ok"}
+
+
+async def _check_db():
+    """Ping the primary, at most once per READY_CACHE_SECONDS however often probes arrive."""
+    global _db_checked_at
+    async with _db_check_lock:
+        if time.monotonic() - _db_checked_at < READY_CACHE_SECONDS:
+            return
+        try:
+            await asyncio.wait_for(asyncio.to_thread(db.ping), READY_PING_TIMEOUT)
+            status = "ok"
+        except Exception as e:
+            if startup_state["db"] == "ok":
+                print(f"⚠️ Readiness: database unreachable ({e})")
+            status = "error"
+        _db_checked_at = time.monotonic()
+        startup_state.update(ready=status == "ok", db=status)
+
+
+@app.get("/health/ready")
+async def readiness():
+    # Until warm-up finishes we're not ready; after that, every probe reflects the DB now
+    if startup_state["db"] is not None:
+        await _check_db()
+    return JSONResponse(status_code=200 if startup_state["ready"] else 503, content=startup_state)
+
+
+@app.get("/metrics")
+def metrics():
+    return {
+        "redis": redis_manager.stats(),
+        "ws_polls": len(polls_ws.active_connections),
+    }
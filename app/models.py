@@ -1,7 +1,7 @@
 # app/models.py
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, ForeignKey, DateTime, Integer, Text, func
+from sqlalchemy import Column, String, ForeignKey, DateTime, Integer, Text, func, UniqueConstraint, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.db import Base
@@ -91,3 +91,22 @@ class Like(Base):
 
     poll = relationship("Poll", back_populates="likes")  # ✅ must match Poll.likes
     user = relationship("User", back_populates="likes")
+
+
+# ------------------------
+# Vote Rollups Table
+# ------------------------
+class VoteRollup(Base):
+    """Pre-aggregated per-option vote counts for one time bucket."""
+    __tablename__ = "vote_rollups"
+    __table_args__ = (
+        UniqueConstraint("option_id", "resolution", "bucket_start", name="uq_vote_rollup_bucket"),
+        Index("ix_vote_rollups_poll_resolution_bucket", "poll_id", "resolution", "bucket_start"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    poll_id = Column(UUID(as_uuid=True), ForeignKey("polls.id", ondelete="CASCADE"), nullable=False)
+    option_id = Column(UUID(as_uuid=True), ForeignKey("options.id", ondelete="CASCADE"), nullable=False)
+    resolution = Column(Text, nullable=False)  # "minute" | "hour" | "day"
+    bucket_start = Column(DateTime(timezone=True), nullable=False)
+    count = Column(Integer, nullable=False, default=0)
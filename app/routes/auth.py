@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from app.db import get_db
 from app import models, schemas
 from app.utils import auth
+from app.utils.rate_limit import rate_limit
 from datetime import timedelta
 
 router = APIRouter()
@@ -25,7 +26,14 @@ def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
 
 # Login
 
-@router.post("/login", response_model=schemas.Token)
+@router.post(
+    "/login",
+    response_model=schemas.Token,
+    dependencies=[
+        Depends(rate_limit("login", "ip", "10/60")),
+        Depends(rate_limit("login", "username", "5/60")),
+    ],
+)
 def login(form_data: schemas.UserLogin, db: Session = Depends(get_db)):
     user = db.query(models.User).filter(models.User.username == form_data.username).first()
 
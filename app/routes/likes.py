@@ -1,18 +1,27 @@
 # app/routes/likes.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from uuid import uuid4
 from app.db import get_db
 from app import models
-from app.utils.dependencies import get_current_user
+from app.utils.dependencies import get_current_user, get_read_db, mark_primary_sticky
+from app.utils.rate_limit import rate_limit
 from app.routes.polls_ws import broadcast_like_update
 
 router = APIRouter(tags=["Likes"])
 
 
-@router.post("/{poll_id}", response_model=dict)
+@router.post(
+    "/{poll_id}",
+    response_model=dict,
+    dependencies=[
+        Depends(rate_limit("like", "user", "30/60")),
+        Depends(rate_limit("like", "ip", "120/60")),
+    ],
+)
 async def toggle_like(
     poll_id: str,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
@@ -38,6 +47,7 @@ async def toggle_like(
 
     db.commit()
     db.refresh(poll)
+    await mark_primary_sticky(request, current_user.id)
 
     try:
         await broadcast_like_update(poll_id)
@@ -50,7 +60,7 @@ async def toggle_like(
 @router.get("/user/{poll_id}", response_model=dict)
 def get_user_like(
     poll_id: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: models.User = Depends(get_current_user),
 ):
     liked = (
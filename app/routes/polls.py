@@ -1,15 +1,18 @@
+from collections import defaultdict
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, Request
+from pydantic_core import to_json
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 from app.db import get_db
 from app import models, schemas
-from app.utils.dependencies import get_current_user
+from app.utils.dependencies import get_current_user, get_read_db, mark_primary_sticky
+from app.utils import rollups
 
 import asyncio
-import json
 
-from app.routes.polls_ws import get_redis
+from app.routes.polls_ws import broadcast_global
 
 router = APIRouter()
 
@@ -20,6 +23,7 @@ router = APIRouter()
 @router.post("/", response_model=schemas.Poll)
 async def create_poll(
     poll: schemas.PollCreate,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
@@ -39,6 +43,7 @@ async def create_poll(
         db.add(db_option)
     db.commit()
     db.refresh(db_poll)
+    await mark_primary_sticky(request, current_user.id)
 
     # ✅ Return normalized poll data for frontend
     poll_data = {
@@ -56,10 +61,8 @@ async def create_poll(
     }
 
     # Broadcast to global WS channel
-    redis_conn = await get_redis()
-    if redis_conn:
-        await redis_conn.publish("polls:global", json.dumps(poll_data,default=str))
-        print("📡 Broadcasted new poll to Redis global channel")
+    await broadcast_global(poll_data)
+    print("📡 Broadcasted new poll to global channel")
 
     return poll_data
 
@@ -70,6 +73,7 @@ async def create_poll(
 @router.delete("/{poll_id}")
 async def delete_poll(
     poll_id: str,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
@@ -88,6 +92,7 @@ async def delete_poll(
     # 4️⃣ Delete the poll itself
     db.delete(db_poll)
     db.commit()
+    await mark_primary_sticky(request, current_user.id)
 
     # 📡 5️⃣ Broadcast the deletion to all connected clients
     poll_data = {
@@ -95,80 +100,140 @@ async def delete_poll(
         "poll_id": str(poll_id),
     }
 
-    redis_conn = await get_redis()
-    if redis_conn:
-        await redis_conn.publish("polls:global", json.dumps(poll_data, default=str))
-        print(f"📡 Broadcasted poll_deleted for Poll ID {poll_id}")
+    await broadcast_global(poll_data)
+    print(f"📡 Broadcasted poll_deleted for Poll ID {poll_id}")
 
     return {"message": "Poll deleted successfully", "poll_id": poll_id}
 
 
 
 # ---------------------------
-# Get All Polls (with votes)
+# Lean read path (feed + single poll)
 # ---------------------------
-@router.get("/", response_model=list[schemas.Poll])
-def get_polls(db: Session = Depends(get_db)):
-    polls = db.query(models.Poll).all()
-    result = []
-
-    for poll in polls:
-        options_data = []
-        for opt in poll.options:
-            vote_count = db.query(models.Vote).filter(models.Vote.option_id == opt.id).count()
-            options_data.append({
-                "id": opt.id,
-                "poll_id": opt.poll_id,
-                "text": opt.text,
-                "votes": vote_count,
-            })
-
-        # ✅ Recalculate likes live from Like table
-        like_count = db.query(models.Like).filter(models.Like.poll_id == poll.id).count()
-
-        poll_data = {
-            "id": poll.id,
-            "title": poll.title,
-            "description": poll.description,
-            "created_at": poll.created_at,
-            "created_by": poll.created_by,
-            "likes_count": like_count,
-            "options": options_data,
+def _poll_rows(db: Session, poll_id: str = None):
+    """
+    Polls in the schemas.Poll shape, built straight from column tuples —
+    no ORM instances, no pydantic round-trip, four queries for any feed size.
+    Key order follows the schema so the JSON matches the documented model.
+    """
+    polls_q = select(
+        models.Poll.id, models.Poll.title, models.Poll.description,
+        models.Poll.created_at, models.Poll.created_by,
+    )
+    # Plain select (not joined + grouped) keeps options in the same order as before
+    options_q = select(models.Option.id, models.Option.poll_id, models.Option.text)
+    votes_q = select(models.Vote.option_id, func.count(models.Vote.id)).group_by(models.Vote.option_id)
+    # ✅ Likes counted live from the Like table
+    likes_q = select(models.Like.poll_id, func.count(models.Like.id)).group_by(models.Like.poll_id)
+
+    if poll_id is not None:
+        polls_q = polls_q.where(models.Poll.id == poll_id)
+        options_q = options_q.where(models.Option.poll_id == poll_id)
+        votes_q = votes_q.where(models.Vote.poll_id == poll_id)
+        likes_q = likes_q.where(models.Like.poll_id == poll_id)
+
+    votes = dict(db.execute(votes_q).all())
+    options = defaultdict(list)
+    for opt_id, opt_poll_id, text in db.execute(options_q):
+        options[opt_poll_id].append(
+            {"text": text, "id": opt_id, "poll_id": opt_poll_id, "votes": votes.get(opt_id, 0)}
+        )
+    likes = dict(db.execute(likes_q).all())
+
+    return [
+        {
+            "title": title,
+            "description": description,
+            "id": pid,
+            "created_at": created_at,
+            "created_by": created_by,
+            "likes_count": likes.get(pid, 0),
+            "options": options.get(pid, []),
         }
-        result.append(poll_data)
+        for pid, title, description, created_at, created_by in db.execute(polls_q)
+    ]
+
 
-    return result
+def _json_response(content):
+    # Already in the response_model shape: serialize once, skip re-validation
+    return Response(to_json(content), media_type="application/json")
+
+
+# ---------------------------
+# Get All Polls (with votes)
+# ---------------------------
+@router.get("/", response_model=list[schemas.Poll])
+def get_polls(db: Session = Depends(get_read_db)):
+    return _json_response(_poll_rows(db))
 
 
 # ---------------------------
 # Get Single Poll (with votes)
 # ---------------------------
 @router.get("/{poll_id}", response_model=schemas.Poll)
-def get_poll(poll_id: str, db: Session = Depends(get_db)):
-    poll = db.query(models.Poll).filter(models.Poll.id == poll_id).first()
-    if not poll:
+def get_poll(poll_id: str, db: Session = Depends(get_read_db)):
+    rows = _poll_rows(db, poll_id)
+    if not rows:
         raise HTTPException(status_code=404, detail="Poll not found")
 
-    options_data = []
-    for opt in poll.options:
-        vote_count = db.query(models.Vote).filter(models.Vote.option_id == opt.id).count()
-        options_data.append({
-            "id": opt.id,
-            "poll_id": opt.poll_id,
-            "text": opt.text,
-            "votes": vote_count,
-        })
+    return _json_response(rows[0])
 
-    like_count = db.query(models.Like).filter(models.Like.poll_id == poll.id).count()
 
-    poll_data = {
-        "id": poll.id,
-        "title": poll.title,
-        "description": poll.description,
-        "created_at": poll.created_at,
-        "created_by": poll.created_by,
-        "likes_count": like_count,
-        "options": options_data,
-    }
+# ---------------------------
+# Current user's vote/like state for many polls
+# ---------------------------
+@router.post("/user-state", response_model=dict[str, schemas.PollUserState])
+def get_user_state(
+    body: schemas.UserStateRequest,
+    db: Session = Depends(get_read_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Batch replacement for /api/votes/user/{id} + /api/likes/user/{id}:
+    one auth lookup and two set-based queries for the whole feed.
+    """
+    poll_ids = set(body.poll_ids)
+    state = {str(pid): {"voted": False, "option_id": None, "liked": False} for pid in poll_ids}
+    if not poll_ids:
+        return state
+
+    votes = (
+        db.query(models.Vote.poll_id, models.Vote.option_id)
+        .filter(models.Vote.user_id == current_user.id, models.Vote.poll_id.in_(poll_ids))
+        .all()
+    )
+    for poll_id, option_id in votes:
+        entry = state[str(poll_id)]
+        entry["voted"] = True
+        entry["option_id"] = option_id
+
+    liked = (
+        db.query(models.Like.poll_id)
+        .filter(models.Like.user_id == current_user.id, models.Like.poll_id.in_(poll_ids))
+        .all()
+    )
+    for (poll_id,) in liked:
+        state[str(poll_id)]["liked"] = True
 
-    return poll_data
+    return state
+
+
+# ---------------------------
+# Vote History (time-series)
+# ---------------------------
+@router.get("/{poll_id}/history")
+def get_poll_history(
+    poll_id: str,
+    resolution: str = Query("hour", pattern="^(minute|hour|day)$"),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Per-option vote counts per time bucket, covering the last `limit` buckets.
+    Served from pre-aggregated rollups, never from raw votes.
+    """
+    poll = db.query(models.Poll.id).filter(models.Poll.id == poll_id).first()
+    if not poll:
+        raise HTTPException(status_code=404, detail="Poll not found")
+
+    return rollups.get_history(db, poll.id, resolution, limit)
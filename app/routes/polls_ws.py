@@ -1,67 +1,145 @@
 import os
 import asyncio
 import json
-import redis.asyncio as redis
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from app.db import SessionLocal, get_db
+from fastapi import APIRouter, WebSocket
+from app.db import SessionLocal, get_db, read_session
 from app import models
+from app.utils.redis_client import redis_manager
 
 router = APIRouter()
 
-REDIS_URL = os.getenv("REDIS_URL")
-redis_client = None
-active_connections = {}  # in-memory fallback
+# In-memory fallback registry: poll_id → set of sockets (O(1) add/discard)
+active_connections = {}
+global_connections = set()
+
+# Liveness is protocol-level: uvicorn sends WebSocket ping frames and closes
+# sockets that miss the pong (--ws-ping-interval / --ws-ping-timeout, see start.sh),
+# so no heartbeat messages are mixed into the JSON stream.
+# A socket that can't take a frame within this many seconds is dropped, so one
+# slow client can't hold up delivery to the rest
+WS_SEND_TIMEOUT = float(os.getenv("WS_SEND_TIMEOUT", "5"))
 
 
 # ---------------------------
 # Redis setup
 # ---------------------------
 async def get_redis():
-    global redis_client
-    if redis_client is None:
-        try:
-            redis_client = redis.from_url(
-                REDIS_URL, encoding="utf-8", decode_responses=True
-            )
-            await redis_client.ping()
-            print(f"✅ Connected to Redis: {REDIS_URL}")
-        except Exception as e:
-            print(f"⚠️ Redis connection failed ({e}), using in-memory fallback")
-            redis_client = None
-    return redis_client
+    """Pooled Redis client, or None while Redis is down or not configured."""
+    return await redis_manager.get()
+
+
+# ---------------------------
+# Local delivery
+# ---------------------------
+async def _fan_out(conns, text: str):
+    """Send `text` to every socket in `conns` concurrently; drop and close the ones that fail."""
+    sockets = list(conns)
+    if not sockets:
+        return
+    results = await asyncio.gather(
+        *(asyncio.wait_for(ws.send_text(text), WS_SEND_TIMEOUT) for ws in sockets),
+        return_exceptions=True,
+    )
+    failed = []
+    for ws, result in zip(sockets, results):
+        if isinstance(result, Exception):
+            print(f"⚠️ Failed to send WS update: {result!r}")
+            conns.discard(ws)
+            failed.append(ws)
+    await asyncio.gather(*(_close_quietly(ws) for ws in failed))
+
+
+async def _close_quietly(websocket: WebSocket):
+    try:
+        await asyncio.wait_for(websocket.close(), WS_SEND_TIMEOUT)
+    except Exception:
+        pass  # already closed
+
+
+async def _send_local(conns, message: dict):
+    """Deliver to this worker's sockets only (Redis down or not configured)."""
+    await _fan_out(conns, json.dumps(message, default=str))
+
+
+# Redis message handlers: fan a channel out to this worker's sockets
+# (payloads are already JSON, no re-encode)
+async def _deliver_global(data: str):
+    await _fan_out(global_connections, data)
+
+
+def _deliver_poll(poll_id: str):
+    async def deliver(data: str):
+        await _fan_out(active_connections.get(poll_id, set()), data)
+
+    return deliver
+
+
+async def broadcast_global(message: dict):
+    """Send a new_poll / poll_deleted event to every global subscriber."""
+    if await get_redis():
+        redis_manager.publish("polls:global", json.dumps(message, default=str))
+    else:
+        await _send_local(global_connections, message)
+
+
+# ---------------------------
+# Poll state messages
+# ---------------------------
+def _vote_message(db, poll_id: str) -> dict:
+    options = (
+        db.query(models.Option.id, models.Option.text)
+        .filter(models.Option.poll_id == poll_id)
+        .all()
+    )
+
+    payload = []
+    for opt in options:
+        count = db.query(models.Vote).filter(models.Vote.option_id == opt.id).count()
+        payload.append({"id": str(opt.id), "text": opt.text, "votes": count})
+
+    return {"poll_id": str(poll_id), "options": payload}
+
+
+def _like_message(db, poll_id: str):
+    poll = db.query(models.Poll).filter(models.Poll.id == poll_id).first()
+    if not poll:
+        return None
+    return {
+        "type": "like_update",
+        "poll_id": str(poll_id),
+        "likes": poll.likes_count or 0,
+    }
+
+
+async def _publish_snapshot(poll_id: str, message: dict, kind: str):
+    """
+    Publish a full-state snapshot for a poll. Snapshots are keyed per poll and
+    kind, so Redis only ever gets the newest one. While Redis is down they go
+    to local sockets *and* replace whatever is still buffered, so the
+    reconnect flush can't roll local clients back to an older state.
+    """
+    channel, data, key = f"poll:{poll_id}", json.dumps(message), f"poll:{poll_id}:{kind}"
+    if await get_redis():
+        redis_manager.publish(channel, data, key=key)
+        print(f"📡 Published {kind} update to Redis for poll {poll_id}")
+    else:
+        await _fan_out(active_connections.get(str(poll_id), set()), data)
+        redis_manager.publish(channel, data, key=key)
 
 
 # ---------------------------
 # Broadcast vote updates
 # ---------------------------
 async def broadcast_vote_update(poll_id: str):
-    """Send updated vote counts to all WebSocket clients."""
+    """
+    Send updated vote counts to all WebSocket clients.
+    Reads the primary: callers have just written, and every subscriber gets
+    this, so it must never be older than what they already have.
+    """
     db = SessionLocal()
     try:
-        options = (
-            db.query(models.Option.id, models.Option.text)
-            .filter(models.Option.poll_id == poll_id)
-            .all()
-        )
-
-        payload = []
-        for opt in options:
-            count = db.query(models.Vote).filter(models.Vote.option_id == opt.id).count()
-            payload.append({"id": str(opt.id), "text": opt.text, "votes": count})
-
-        message = {"poll_id": str(poll_id), "options": payload}
-
-        redis_conn = await get_redis()
-        if redis_conn:
-            await redis_conn.publish(f"poll:{poll_id}", json.dumps(message))
-            print(f"📡 Published update to Redis for poll {poll_id}")
-        else:
-            if poll_id in active_connections:
-                for ws in active_connections[poll_id]:
-                    try:
-                        await ws.send_json(message)
-                    except Exception as e:
-                        print(f"⚠️ Failed to send WS update: {e}")
+        message = _vote_message(db, poll_id)
+        await _publish_snapshot(poll_id, message, "votes")
     finally:
         db.close()  # ✅ ensure session released
 
@@ -70,34 +148,55 @@ async def broadcast_vote_update(poll_id: str):
 # Broadcast like updates
 # ---------------------------
 async def broadcast_like_update(poll_id: str):
-    """Send updated like count to all WebSocket clients for this poll."""
+    """Send updated like count to all WebSocket clients for this poll (read from the primary)."""
     db = SessionLocal()
     try:
-        poll = db.query(models.Poll).filter(models.Poll.id == poll_id).first()
-        if not poll:
-            return
-
-        message = {
-            "type": "like_update",
-            "poll_id": str(poll_id),
-            "likes": poll.likes_count or 0,
-        }
-
-        redis_conn = await get_redis()
-        if redis_conn:
-            await redis_conn.publish(f"poll:{poll_id}", json.dumps(message))
-            print(f"❤️ Published like update to Redis for poll {poll_id}")
-        else:
-            if poll_id in active_connections:
-                for ws in active_connections[poll_id]:
-                    try:
-                        await ws.send_json(message)
-                    except Exception as e:
-                        print(f"⚠️ Failed to send WS like update: {e}")
+        message = _like_message(db, poll_id)
+        if message:
+            await _publish_snapshot(poll_id, message, "likes")
     finally:
         db.close()  # ✅ ensure session released
 
 
+# ---------------------------
+# Initial state for a new socket
+# ---------------------------
+async def _send_snapshot(websocket: WebSocket, poll_id: str):
+    """
+    Send the current counts and likes to one newly connected socket only.
+    Reading a replica is fine here: a lagging snapshot reaches just this
+    client, never the other subscribers of the poll.
+    """
+    db = read_session()
+    try:
+        messages = [_vote_message(db, poll_id), _like_message(db, poll_id)]
+    finally:
+        db.close()
+
+    for message in messages:
+        if message:
+            await asyncio.wait_for(websocket.send_text(json.dumps(message)), WS_SEND_TIMEOUT)
+
+
+# ---------------------------
+# Connection lifecycle
+# ---------------------------
+async def _serve(websocket: WebSocket):
+    """
+    Hold one socket open until it goes away. Client frames are read and
+    ignored — reading is what surfaces disconnects, including the close uvicorn
+    raises when a half-open socket misses its pong. Updates reach the socket
+    through the worker's shared Redis subscription (or local broadcasts).
+    """
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+    finally:
+        await _close_quietly(websocket)
+
+
 # ---------------------------
 # Global WebSocket endpoint (new poll broadcast)
 # ---------------------------
@@ -106,28 +205,14 @@ async def websocket_all_polls(websocket: WebSocket):
     await websocket.accept()
     print("🌍 Global Poll WebSocket connected")
 
-    redis_conn = await get_redis()
-    pubsub = None
-
-    if redis_conn:
-        pubsub = redis_conn.pubsub()
-        await pubsub.subscribe("polls:global")
-        print("✅ Subscribed to Redis channel polls:global")
-
+    global_connections.add(websocket)
     try:
-        if pubsub:
-            async for message in pubsub.listen():
-                if message and message["type"] == "message":
-                    data = json.loads(message["data"])
-                    await websocket.send_json(data)
-        else:
-            while True:
-                await asyncio.sleep(15)
-    except WebSocketDisconnect:
+        await redis_manager.subscribe("polls:global", _deliver_global)
+        await _serve(websocket)
+    finally:
+        global_connections.discard(websocket)
+        await redis_manager.unsubscribe("polls:global")
         print("❌ Global Poll WebSocket disconnected")
-        if pubsub:
-            await pubsub.unsubscribe("polls:global")
-            await pubsub.close()
 
 
 # ---------------------------
@@ -138,35 +223,18 @@ async def websocket_poll_updates(websocket: WebSocket, poll_id: str):
     await websocket.accept()
     print(f"🔗 WebSocket connected for poll {poll_id}")
 
-    # Immediately send latest state
-    await broadcast_vote_update(poll_id)
-    await broadcast_like_update(poll_id)
-
-    if poll_id not in active_connections:
-        active_connections[poll_id] = []
-    active_connections[poll_id].append(websocket)
-
-    redis_conn = await get_redis()
-    pubsub = None
-
-    if redis_conn:
-        pubsub = redis_conn.pubsub()
-        await pubsub.subscribe(f"poll:{poll_id}")
-        print(f"✅ Subscribed to Redis channel poll:{poll_id}")
-
+    # Register (and subscribe) first, then send the latest state to this
+    # socket alone — updates from here on reach it through the registry
+    active_connections.setdefault(poll_id, set()).add(websocket)
     try:
-        if pubsub:
-            async for message in pubsub.listen():
-                if message and message["type"] == "message":
-                    await websocket.send_json(json.loads(message["data"]))
-        else:
-            while True:
-                await asyncio.sleep(15)
-    except WebSocketDisconnect:
+        await redis_manager.subscribe(f"poll:{poll_id}", _deliver_poll(poll_id))
+        await _send_snapshot(websocket, poll_id)
+        await _serve(websocket)
+    finally:
+        conns = active_connections.get(poll_id)
+        if conns is not None:
+            conns.discard(websocket)
+            if not conns:
+                del active_connections[poll_id]
+        await redis_manager.unsubscribe(f"poll:{poll_id}")
         print(f"❌ WebSocket disconnected for poll {poll_id}")
-        active_connections[poll_id].remove(websocket)
-        if not active_connections[poll_id]:
-            del active_connections[poll_id]
-        if pubsub:
-            await pubsub.unsubscribe(f"poll:{poll_id}")
-            await pubsub.close()
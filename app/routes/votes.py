@@ -1,9 +1,13 @@
 # app/routes/votes.py
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from app.db import get_db
 from app import models, schemas
-from app.utils.dependencies import get_current_user  # updated import
+from app.utils.dependencies import get_current_user, get_read_db, mark_primary_sticky  # updated import
+from app.utils import rollups
+from app.utils.rate_limit import rate_limit
 
 router = APIRouter()
 
@@ -14,9 +18,17 @@ router = APIRouter()
 from app.routes.polls_ws import broadcast_vote_update
 
 
-@router.post("/", response_model=schemas.VoteCreate)
+@router.post(
+    "/",
+    response_model=schemas.VoteCreate,
+    dependencies=[
+        Depends(rate_limit("vote", "user", "20/60")),
+        Depends(rate_limit("vote", "ip", "120/60")),
+    ],
+)
 async def cast_vote(
     vote: schemas.VoteCreate,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
@@ -38,14 +50,20 @@ async def cast_vote(
         )
 
     # ✅ Create a new vote
+    voted_at = datetime.now(timezone.utc)
     db_vote = models.Vote(
         poll_id=vote.poll_id,
         option_id=vote.option_id,
-        user_id=current_user.id
+        user_id=current_user.id,
+        created_at=voted_at,
     )
     db.add(db_vote)
+
+    # ✅ Keep time-series rollups in step (same transaction, same timestamp)
+    rollups.record_vote(db, vote.poll_id, vote.option_id, voted_at)
     db.commit()
     db.refresh(db_vote)
+    await mark_primary_sticky(request, current_user.id)
 
     # ✅ Broadcast update
     await broadcast_vote_update(vote.poll_id)
@@ -55,7 +73,7 @@ async def cast_vote(
 @router.get("/user/{poll_id}")
 def get_user_vote(
     poll_id: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: models.User = Depends(get_current_user)
 ):
     existing_vote = (
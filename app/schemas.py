@@ -81,3 +81,13 @@ class VoteCreate(BaseModel):
 # Like
 class LikeUpdate(BaseModel):
     poll_id: UUID
+
+
+# Per-user state (batch)
+class UserStateRequest(BaseModel):
+    poll_ids: List[UUID] = Field(..., max_length=500)
+
+class PollUserState(BaseModel):
+    voted: bool = False
+    option_id: Optional[UUID] = None
+    liked: bool = False
@@ -1,9 +1,10 @@
 # app/utils/auth.py
-from passlib.hash import pbkdf2_sha256
 from datetime import datetime, timedelta
-from jose import jwt
 import os
 
+# passlib and jose (with its crypto backends) are imported on first use:
+# together they are ~100ms of import time that workers shouldn't pay at boot.
+
 # Secret key for JWT
 # 🔐 Read from environment variables, with a fallback
 SECRET_KEY = os.getenv("SECRET_KEY", "your_super_secret_key_here")
@@ -14,10 +15,12 @@ ALGORITHM = os.getenv("ALGORITHM", "HS256")
 # Password hashing
 # ---------------------------
 def hash_password(password: str) -> str:
+    from passlib.hash import pbkdf2_sha256
     return pbkdf2_sha256.hash(password)
 
 
 def verify_password(password: str, hashed: str) -> bool:
+    from passlib.hash import pbkdf2_sha256
     return pbkdf2_sha256.verify(password, hashed)
 
 
@@ -25,6 +28,7 @@ def verify_password(password: str, hashed: str) -> bool:
 # JWT Token
 # ---------------------------
 def create_access_token(data: dict, expires_delta: timedelta = None):
+    from jose import jwt
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(hours=1))
     to_encode.update({"exp": expire})
@@ -33,8 +37,17 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
 
 
 def decode_access_token(token: str):
+    from jose import jwt
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         return payload
     except Exception:
         return None
+
+
+def token_user_id(authorization: str):
+    """User id from an `Authorization: Bearer …` header, without a DB lookup."""
+    if not authorization or not authorization.lower().startswith("bearer "):
+        return None
+    payload = decode_access_token(authorization[7:])
+    return payload.get("user_id") if payload else None
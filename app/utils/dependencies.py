@@ -1,9 +1,15 @@
-from fastapi import Depends, HTTPException
+import asyncio
+import time
+
+from fastapi import Depends, HTTPException, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import Session
-from app.db import get_db
+from app.db import REPLICA_STICKY_SECONDS, get_db, replica_session, replicas
 from app import models
-from app.utils.auth import decode_access_token
+from app.utils.auth import decode_access_token, token_user_id
+from app.utils.rate_limit import client_ip
+from app.utils.redis_client import REDIS_OP_TIMEOUT, redis_manager
 
 # HTTP Bearer security
 security = HTTPBearer()
@@ -19,3 +25,81 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
     return user
+
+
+# ---------------------------
+# Read-replica routing
+# ---------------------------
+# Read-your-writes: after a write, reads from the same user *or the same client
+# IP* stay on the primary for REPLICA_STICKY_SECONDS. The feed and poll reads are
+# public and usually sent without a token, so the IP is what ties them to the
+# write; other clients behind that IP just read the primary briefly too.
+# Kept in Redis (shared by workers) and locally.
+_sticky = {}  # "u:<user_id>" / "ip:<addr>" → monotonic expiry
+
+
+def _sticky_keys(request: Request, user_id=None):
+    keys = [f"ip:{client_ip(request)}"]
+    if user_id:
+        keys.append(f"u:{user_id}")
+    return keys
+
+
+async def mark_primary_sticky(request: Request, user_id):
+    if not replicas:
+        return
+    keys = _sticky_keys(request, user_id)
+    now = time.monotonic()
+    if len(_sticky) > 10_000:
+        for key, until in list(_sticky.items()):
+            if until <= now:
+                del _sticky[key]
+    for key in keys:
+        _sticky[key] = now + REPLICA_STICKY_SECONDS
+
+    client = await redis_manager.get()
+    if client:
+        try:
+            async with client.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.set(f"sticky:{key}", 1, px=int(REPLICA_STICKY_SECONDS * 1000))
+                await asyncio.wait_for(pipe.execute(), REDIS_OP_TIMEOUT)
+        except Exception as e:
+            redis_manager.mark_failure(e)
+
+
+async def _read_from_primary(request: Request) -> bool:
+    if not replicas:
+        return True
+    keys = _sticky_keys(request, token_user_id(request.headers.get("authorization")))
+    now = time.monotonic()
+    if any(_sticky.get(key, 0) > now for key in keys):
+        return True
+
+    client = await redis_manager.get()
+    if client:
+        try:
+            sticky = [f"sticky:{key}" for key in keys]
+            return bool(await asyncio.wait_for(client.exists(*sticky), REDIS_OP_TIMEOUT))
+        except Exception as e:
+            redis_manager.mark_failure(e)
+    return False
+
+
+def get_read_db(use_primary: bool = Depends(_read_from_primary)):
+    """
+    Session for read-only endpoints: a healthy replica, or the primary when
+    there are none, all are down, or the caller wrote within the sticky window.
+    """
+    replica, db = (None, None) if use_primary else replica_session()
+    if db is None:
+        yield from get_db()
+        return
+
+    try:
+        yield db
+    except OperationalError as e:
+        replica.mark_down(e)
+        raise
+    finally:
+        db.close()
@@ -0,0 +1,165 @@
+# app/utils/rate_limit.py
+import asyncio
+import math
+import os
+import time
+
+from fastapi import HTTPException, Request
+
+from app.utils.redis_client import REDIS_OP_TIMEOUT, redis_manager
+from app.utils.auth import token_user_id
+
+# ---------------------------
+# Token bucket (Redis, shared across workers)
+# ---------------------------
+# KEYS[1] = bucket key, ARGV[1] = capacity, ARGV[2] = refill rate (tokens/sec)
+# Returns {allowed (0/1), seconds until next token}
+TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+
+local data = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(data[1]) or capacity
+local ts = tonumber(data[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring((1 - tokens) / rate)}
+"""
+
+_script = {"client": None, "script": None}  # EVALSHA handle for the current client
+
+
+async def _redis_take(redis_conn, key: str, capacity: int, rate: float):
+    if _script["client"] is not redis_conn:
+        _script["client"] = redis_conn
+        _script["script"] = redis_conn.register_script(TOKEN_BUCKET_LUA)
+    allowed, retry_after = await _script["script"](keys=[key], args=[capacity, rate])
+    return bool(int(allowed)), float(retry_after)
+
+
+# ---------------------------
+# In-process fallback (per worker)
+# ---------------------------
+_local_buckets = {}  # key → [tokens, last refill (monotonic)]
+_LOCAL_MAX_KEYS = 100_000
+
+
+def _local_take(key: str, capacity: int, rate: float):
+    now = time.monotonic()
+    bucket = _local_buckets.get(key)
+    if bucket is None:
+        if len(_local_buckets) >= _LOCAL_MAX_KEYS:
+            _prune_local(now)
+        bucket = _local_buckets[key] = [capacity, now]
+
+    tokens = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+    bucket[1] = now
+    if tokens >= 1:
+        bucket[0] = tokens - 1
+        return True, 0.0
+    bucket[0] = tokens
+    return False, (1 - tokens) / rate
+
+
+def _prune_local(now: float):
+    """Drop buckets idle for an hour; if still full, start over rather than grow."""
+    for key, (tokens, ts) in list(_local_buckets.items()):
+        if now - ts > 3600:
+            del _local_buckets[key]
+    if len(_local_buckets) >= _LOCAL_MAX_KEYS:
+        _local_buckets.clear()
+
+
+# ---------------------------
+# Limit config
+# ---------------------------
+def parse_limit(spec: str):
+    """'30/60' → (capacity=30, refill rate=0.5 tokens/sec)."""
+    count, seconds = spec.split("/")
+    capacity = int(count)
+    return capacity, capacity / float(seconds)
+
+
+def get_limit(name: str, scope: str, default: str):
+    """Read RATE_LIMIT_<NAME>_<SCOPE> (e.g. RATE_LIMIT_LIKE_USER=30/60), else default."""
+    return parse_limit(os.getenv(f"RATE_LIMIT_{name.upper()}_{scope.upper()}", default))
+
+
+def client_ip(request: Request) -> str:
+    # Never read X-Forwarded-For here — any client can send it. Uvicorn's
+    # --proxy-headers rewrites request.client from it only when the peer is in
+    # FORWARDED_ALLOW_IPS (see start.sh), i.e. when it came through our proxy.
+    return request.client.host if request.client else "unknown"
+
+
+# ---------------------------
+# FastAPI dependency
+# ---------------------------
+async def _identity(request: Request, scope: str) -> str:
+    """
+    Who a bucket belongs to: the token's user ("user"), the `username` in the
+    JSON body plus the client IP ("username", for login), or the client IP.
+    Scopes that can't identify the caller fall back to the IP.
+    """
+    if scope == "ip":
+        return client_ip(request)
+    if scope == "user":
+        user_id = token_user_id(request.headers.get("authorization"))
+        if user_id:
+            return f"u:{user_id}"
+    elif scope == "username":
+        try:
+            body = await request.json()  # cached on the request; FastAPI reuses it
+        except ValueError:
+            body = None
+        username = body.get("username") if isinstance(body, dict) else None
+        if isinstance(username, str) and username:
+            # Never the username alone: usernames are public, and a bucket
+            # shared by every IP would let anyone lock a user out of login
+            return f"n:{username[:150]}:ip:{client_ip(request)}"
+    return f"ip:{client_ip(request)}"
+
+
+def rate_limit(name: str, scope: str, default: str):
+    """
+    Dependency enforcing a token bucket per user ("user"), per login username
+    and client IP ("username") or per client IP ("ip").
+    Put it in the route's `dependencies=[...]` so it runs before get_current_user
+    and the endpoint — a rejected request never reaches the DB or password hashing.
+    """
+    capacity, rate = get_limit(name, scope, default)
+
+    async def dependency(request: Request):
+        # Scope is part of the key: a "user" bucket falling back to the IP must
+        # not share tokens with the route's "ip" bucket
+        key = f"rl:{name}:{scope}:{await _identity(request, scope)}"
+        allowed, retry_after = await check(key, capacity, rate)
+        if not allowed:
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests, slow down.",
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+            )
+
+    return dependency
+
+
+async def check(key: str, capacity: int, rate: float):
+    """Take one token from `key`; Redis when reachable, else this worker's buckets."""
+    redis_conn = await redis_manager.get()
+    if redis_conn:
+        try:
+            return await asyncio.wait_for(_redis_take(redis_conn, key, capacity, rate), REDIS_OP_TIMEOUT)
+        except Exception as e:
+            redis_manager.mark_failure(e)
+    return _local_take(key, capacity, rate)
@@ -0,0 +1,316 @@
+# app/utils/redis_client.py
+import asyncio
+import os
+import random
+import time
+from itertools import count, islice
+
+REDIS_URL = os.getenv("REDIS_URL")
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+REDIS_PUBLISH_BUFFER = int(os.getenv("REDIS_PUBLISH_BUFFER", "1000"))
+REDIS_BACKOFF_MAX = float(os.getenv("REDIS_BACKOFF_MAX", "30"))
+REDIS_OP_TIMEOUT = float(os.getenv("REDIS_OP_TIMEOUT", "2"))
+REDIS_POLL_INTERVAL = 1.0  # how long the subscriber blocks waiting for a message
+
+PUBLISH_BATCH = 100
+
+
+class RedisManager:
+    """
+    Owns the pooled Redis client for this worker.
+
+    - get() returns the client while the circuit is closed, or None while it is
+      open, so callers fall back to in-memory delivery instead of raising. It
+      only reads state and never waits on Redis.
+    - A failed op trips the circuit; a background task probes reconnects with
+      exponential backoff (plus jitter), off every request's path.
+    - publish() never awaits Redis: messages go into a bounded buffer that a
+      background task flushes, and that survives short outages. Full-state
+      snapshots carry a key and only the latest per key is kept, so a stale
+      one is never replayed after a newer one.
+    - subscribe()/unsubscribe() share one PubSub connection per worker, on its
+      own pool, whatever the number of WebSockets; a background task reads it
+      and hands each message to the channel's handler, re-subscribing after
+      reconnects.
+    - An exhausted pool means the worker is busy, not that Redis is down, so
+      it is counted but never opens the circuit.
+    """
+
+    def __init__(self, url):
+        self.url = url
+        self.client = None
+        self.state = "disabled" if not url else "disconnected"  # → connected | open
+        self.failures = 0
+        self.next_attempt = 0.0
+        self.last_error = None
+        self.reconnects = 0
+        self.published = 0
+        self.dropped = 0
+        self.exhausted = 0
+        self._buffer = {}  # key → (channel, message), oldest first
+        self._event_ids = count()
+        self._wakeup = None
+        self._publisher = None
+        self._prober = None
+        self._pubsub_client = None
+        self._pubsub = None
+        self._subscriber = None
+        self._sub_lock = None
+        self._subscriptions = {}  # channel → [local subscribers, handler]
+        self._subscribed = set()  # channels the live PubSub is subscribed to
+
+    # ---------------------------
+    # Connection + circuit breaker
+    # ---------------------------
+    def _build_client(self, max_connections=REDIS_MAX_CONNECTIONS):
+        import redis.asyncio as redis  # only workers with REDIS_URL pay for the import
+
+        pool = redis.ConnectionPool.from_url(
+            self.url,
+            max_connections=max_connections,
+            encoding="utf-8",
+            decode_responses=True,
+            socket_connect_timeout=REDIS_OP_TIMEOUT,
+            socket_keepalive=True,
+            health_check_interval=30,
+        )
+        return redis.Redis(connection_pool=pool)
+
+    async def get(self):
+        """The client while the circuit is closed, else None (and a probe is scheduled)."""
+        if self.state == "connected":
+            return self.client
+        if self.state != "disabled":
+            self._kick_prober()
+        return None
+
+    def _kick_prober(self):
+        if self._prober is None or self._prober.done():
+            self._prober = asyncio.create_task(self._probe_until_connected())
+
+    async def _probe_until_connected(self):
+        while self.state not in ("connected", "disabled"):
+            delay = self.next_attempt - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await self.probe()
+
+    async def probe(self) -> bool:
+        """One reconnect attempt: ping, then close the circuit or back off further."""
+        try:
+            if self.client is None:
+                self.client = self._build_client()
+            await asyncio.wait_for(self.client.ping(), REDIS_OP_TIMEOUT)
+        except Exception as e:
+            if self._pool_exhausted(e):
+                self.next_attempt = time.monotonic() + 0.5  # busy, not down: retry soon
+            else:
+                self._trip(e)
+            return False
+
+        if self.state != "connected":
+            if self.failures:
+                self.reconnects += 1
+            self.state = "connected"
+            self.failures = 0
+            self.last_error = None
+            print(f"✅ Connected to Redis: {self.url}")
+        if self._buffer:
+            self._kick_publisher()
+        return True
+
+    def mark_failure(self, error):
+        """Report a failed Redis op; opens the circuit until the next probe."""
+        if self._pool_exhausted(error):
+            return
+        if self.state == "connected":
+            print(f"⚠️ Redis connection lost ({error}), using in-memory fallback")
+        self._trip(error)
+        self._kick_prober()
+
+    def _trip(self, error):
+        if self.state != "connected" and self.failures == 0:
+            print(f"⚠️ Redis connection failed ({error}), using in-memory fallback")
+        self.failures += 1
+        self.last_error = str(error)
+        self.state = "open"
+        backoff = min(REDIS_BACKOFF_MAX, 0.5 * 2 ** (self.failures - 1))
+        self.next_attempt = time.monotonic() + backoff * random.uniform(0.5, 1.0)
+
+    def _pool_exhausted(self, error) -> bool:
+        from redis.exceptions import MaxConnectionsError
+
+        if isinstance(error, MaxConnectionsError):
+            self.exhausted += 1
+            return True
+        return False
+
+    def retry_delay(self) -> float:
+        return max(0.1, self.next_attempt - time.monotonic())
+
+    # ---------------------------
+    # Non-blocking publish
+    # ---------------------------
+    def publish(self, channel: str, message: str, key=None):
+        """
+        Queue a message for Redis. A message with a `key` (a full-state
+        snapshot) replaces any pending one with the same key; messages without
+        one are events and are all kept. The oldest is dropped when full.
+        """
+        if self.state == "disabled":
+            return
+        if key is None:
+            key = ("event", next(self._event_ids))
+        else:
+            self._buffer.pop(key, None)  # re-queue at the back, newest wins
+        if len(self._buffer) >= REDIS_PUBLISH_BUFFER:
+            del self._buffer[next(iter(self._buffer))]
+            self.dropped += 1
+        self._buffer[key] = (channel, message)
+        self._kick_publisher()
+
+    def _kick_publisher(self):
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        self._wakeup.set()
+        if self._publisher is None or self._publisher.done():
+            self._publisher = asyncio.create_task(self._drain())
+
+    async def _drain(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self._buffer:
+                client = await self.get()
+                if client is None:
+                    await asyncio.sleep(self.retry_delay())
+                    continue
+
+                batch = list(islice(self._buffer.items(), PUBLISH_BATCH))
+                try:
+                    async with client.pipeline(transaction=False) as pipe:
+                        for _, (channel, message) in batch:
+                            pipe.publish(channel, message)
+                        await asyncio.wait_for(pipe.execute(), REDIS_OP_TIMEOUT)
+                except Exception as e:
+                    self.mark_failure(e)
+                    continue
+
+                # Items may have been replaced by newer ones while we awaited
+                for key, item in batch:
+                    if self._buffer.get(key) is item:
+                        del self._buffer[key]
+                self.published += len(batch)
+
+    # ---------------------------
+    # Shared subscription
+    # ---------------------------
+    async def subscribe(self, channel: str, handler):
+        """
+        Register one local subscriber of `channel`; `await handler(data)` runs
+        for each message. Only the first subscriber subscribes the worker.
+        """
+        if self.state == "disabled":
+            return
+        entry = self._subscriptions.setdefault(channel, [0, handler])
+        entry[0] += 1
+        entry[1] = handler
+        await self._sync(channel)
+
+    async def unsubscribe(self, channel: str):
+        """Drop one local subscriber; the last one unsubscribes the worker."""
+        entry = self._subscriptions.get(channel)
+        if entry is None:
+            return
+        entry[0] -= 1
+        if entry[0] <= 0:
+            del self._subscriptions[channel]
+            await self._sync(channel)
+
+    async def _sync(self, channel: str):
+        # Reconcile under the lock rather than trusting the call order: a
+        # subscribe racing an unsubscribe of the same channel ends up right
+        if self._subscriber is None or self._subscriber.done():
+            self._subscriber = asyncio.create_task(self._listen())
+        if self._sub_lock is None:
+            self._sub_lock = asyncio.Lock()
+        async with self._sub_lock:
+            if self._pubsub is None:
+                return  # _listen subscribes every wanted channel once connected
+            try:
+                if channel in self._subscriptions and channel not in self._subscribed:
+                    await self._pubsub.subscribe(channel)
+                    self._subscribed.add(channel)
+                elif channel not in self._subscriptions and channel in self._subscribed:
+                    await self._pubsub.unsubscribe(channel)
+                    self._subscribed.discard(channel)
+            except Exception:
+                pass  # the reader sees the same failure and reconnects
+
+    async def _listen(self):
+        """Read the shared PubSub and dispatch messages until cancelled."""
+        from redis import exceptions as redis_errors
+
+        if self._sub_lock is None:
+            self._sub_lock = asyncio.Lock()
+        while True:
+            if await self.get() is None:
+                await asyncio.sleep(self.retry_delay())
+                continue
+
+            if self._pubsub_client is None:
+                self._pubsub_client = self._build_client(max_connections=1)
+            pubsub = self._pubsub_client.pubsub(ignore_subscribe_messages=True)
+            try:
+                async with self._sub_lock:
+                    await pubsub.connect()
+                    if self._subscriptions:
+                        await pubsub.subscribe(*self._subscriptions)
+                    self._subscribed = set(self._subscriptions)
+                    self._pubsub = pubsub
+
+                while True:
+                    message = await pubsub.get_message(timeout=REDIS_POLL_INTERVAL)
+                    if not message or message["type"] != "message":
+                        continue
+                    entry = self._subscriptions.get(message["channel"])
+                    if entry is not None:
+                        try:
+                            await entry[1](message["data"])
+                        except Exception as e:
+                            print(f"⚠️ Redis message handler failed: {e}")
+            except (redis_errors.ConnectionError, redis_errors.TimeoutError, OSError) as e:
+                self.mark_failure(e)
+            finally:
+                self._pubsub = None
+                self._subscribed = set()
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    async def close(self):
+        for task in (self._publisher, self._subscriber, self._prober):
+            if task:
+                task.cancel()
+        if self._subscriber:
+            await asyncio.gather(self._subscriber, return_exceptions=True)
+        for client in (self.client, self._pubsub_client):
+            if client is not None:
+                await client.aclose()
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "reconnects": self.reconnects,
+            "last_error": self.last_error,
+            "buffered": len(self._buffer),
+            "published": self.published,
+            "dropped": self.dropped,
+            "pool_exhausted": self.exhausted,
+            "channels": len(self._subscriptions),
+        }
+
+
+redis_manager = RedisManager(REDIS_URL)
@@ -0,0 +1,173 @@
+# app/utils/rollups.py
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, literal, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app import models
+
+# Bucket widths, keyed by the name Postgres' date_trunc understands
+RESOLUTIONS = {
+    "minute": timedelta(minutes=1),
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+}
+
+
+def truncate(ts: datetime, resolution: str) -> datetime:
+    """Floor a timestamp to the start of its bucket (UTC)."""
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    ts = ts.astimezone(timezone.utc)
+    if resolution == "minute":
+        return ts.replace(second=0, microsecond=0)
+    if resolution == "hour":
+        return ts.replace(minute=0, second=0, microsecond=0)
+    return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _lock_key(poll_id):
+    return func.hashtext(f"vote_rollups:{poll_id}")
+
+
+# ---------------------------
+# Incremental update (called from cast_vote)
+# ---------------------------
+def record_vote(db: Session, poll_id, option_id, at: datetime):
+    """
+    Bump the minute/hour/day buckets for one vote. `at` must be the vote's
+    own created_at, so a rebuild puts it in the same buckets.
+    Runs inside the caller's transaction — the caller commits, which also
+    releases the shared lock that keeps a concurrent rebuild out.
+    """
+    db.execute(select(func.pg_advisory_xact_lock_shared(_lock_key(poll_id))))
+    rows = [
+        {
+            "poll_id": poll_id,
+            "option_id": option_id,
+            "resolution": resolution,
+            "bucket_start": truncate(at, resolution),
+            "count": 1,
+        }
+        for resolution in RESOLUTIONS
+    ]
+    stmt = insert(models.VoteRollup).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_vote_rollup_bucket",
+        set_={"count": models.VoteRollup.count + 1},
+    )
+    db.execute(stmt)
+
+
+# ---------------------------
+# Compactor (backfill / repair from raw votes)
+# ---------------------------
+def rebuild_rollups(db: Session, poll_id=None):
+    """
+    Recompute rollup buckets from the raw votes table, for one poll or all.
+    Use it to backfill votes cast before rollups existed or to repair drift.
+
+    Each poll is rebuilt in its own transaction under an exclusive advisory
+    lock: votes in flight finish first, new ones wait, and stale buckets are
+    deleted rather than left behind.
+    """
+    poll_ids = [poll_id] if poll_id is not None else [pid for (pid,) in db.execute(select(models.Poll.id))]
+    for pid in poll_ids:
+        try:
+            _rebuild_poll(db, pid)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+
+def _rebuild_poll(db: Session, poll_id):
+    db.execute(select(func.pg_advisory_xact_lock(_lock_key(poll_id))))
+    db.query(models.VoteRollup).filter(models.VoteRollup.poll_id == poll_id).delete(synchronize_session=False)
+
+    for resolution in RESOLUTIONS:
+        # date_trunc in UTC, back to timestamptz — same buckets as truncate()
+        bucket = func.date_trunc(resolution, func.timezone("UTC", models.Vote.created_at))
+        source = (
+            select(
+                models.Vote.poll_id,
+                models.Vote.option_id,
+                literal(resolution),
+                func.timezone("UTC", bucket),
+                func.count(models.Vote.id),
+            )
+            .where(models.Vote.poll_id == poll_id, models.Vote.option_id.isnot(None))
+            .group_by(models.Vote.poll_id, models.Vote.option_id, bucket)
+        )
+        db.execute(
+            insert(models.VoteRollup).from_select(
+                ["poll_id", "option_id", "resolution", "bucket_start", "count"], source
+            )
+        )
+
+
+# ---------------------------
+# Read path
+# ---------------------------
+def get_history(db: Session, poll_id, resolution: str, limit: int):
+    """
+    Return array-oriented history for a poll: one shared list of bucket
+    timestamps and, per option, a parallel list of vote counts per bucket.
+    Only rollup rows are read, so cost scales with buckets, not votes.
+    """
+    since = truncate(datetime.now(timezone.utc), resolution) - RESOLUTIONS[resolution] * (limit - 1)
+
+    options = (
+        db.query(models.Option.id, models.Option.text)
+        .filter(models.Option.poll_id == poll_id)
+        .all()
+    )
+    rows = (
+        db.query(
+            models.VoteRollup.option_id,
+            models.VoteRollup.bucket_start,
+            models.VoteRollup.count,
+        )
+        .filter(
+            models.VoteRollup.poll_id == poll_id,
+            models.VoteRollup.resolution == resolution,
+            models.VoteRollup.bucket_start >= since,
+        )
+        .order_by(models.VoteRollup.bucket_start)
+        .all()
+    )
+
+    buckets = []
+    index = {}
+    for _, bucket_start, _ in rows:
+        if bucket_start not in index:
+            index[bucket_start] = len(buckets)
+            buckets.append(bucket_start)
+
+    counts = {opt.id: [0] * len(buckets) for opt in options}
+    for option_id, bucket_start, count in rows:
+        if option_id in counts:
+            counts[option_id][index[bucket_start]] = count
+
+    return {
+        "poll_id": str(poll_id),
+        "resolution": resolution,
+        "buckets": [b.isoformat() for b in buckets],
+        "options": [
+            {"id": str(opt.id), "text": opt.text, "counts": counts[opt.id]}
+            for opt in options
+        ],
+    }
+
+
+if __name__ == "__main__":
+    # python -m app.utils.rollups  → backfill rollups for every poll
+    from app.db import SessionLocal
+
+    db = SessionLocal()
+    try:
+        rebuild_rollups(db)
+        print("✅ Vote rollups rebuilt")
+    finally:
+        db.close()
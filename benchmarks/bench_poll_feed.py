@@ -0,0 +1,150 @@
+# benchmarks/bench_poll_feed.py
+"""
+Feed read path, three ways. Uses an in-memory SQLite database.
+
+- batched: the fair baseline — ORM rows with options eager-loaded, counts in two
+  GROUP BY queries, then response_model-style TypeAdapter validation.
+- lean: the column-tuple path in app.routes.polls (no ORM objects, no re-validation).
+- legacy: get_polls as it was, one count query per option and per poll (N+1).
+  Slow at 10k polls, so only with FEED_LEGACY=1.
+
+    python -m benchmarks.bench_poll_feed
+    FEED_POLLS=2000 FEED_LEGACY=1 python -m benchmarks.bench_poll_feed
+"""
+import os
+import random
+import time
+import tracemalloc
+import uuid
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import selectinload, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import models, schemas
+from app.routes import polls
+
+POLLS = int(os.getenv("FEED_POLLS", "10000"))
+OPTIONS = 3
+LEGACY = os.getenv("FEED_LEGACY", "0") == "1"
+
+
+def seed():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    models.Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    rng = random.Random(0)
+
+    user_ids = [uuid.uuid4() for _ in range(50)]
+    db.add_all(
+        models.User(id=uid, username=f"u{i}", email=f"u{i}@x.io", password_hash="x")
+        for i, uid in enumerate(user_ids)
+    )
+    for p in range(POLLS):
+        poll = models.Poll(id=uuid.uuid4(), title=f"Poll {p}", description="…", created_by="u0", likes_count=0)
+        db.add(poll)
+        option_ids = [uuid.uuid4() for _ in range(OPTIONS)]
+        db.add_all(models.Option(id=oid, poll_id=poll.id, text=f"Option {i}") for i, oid in enumerate(option_ids))
+        for uid in rng.sample(user_ids, 3):
+            db.add(models.Vote(poll_id=poll.id, option_id=rng.choice(option_ids), user_id=uid))
+        for uid in rng.sample(user_ids, 2):
+            db.add(models.Like(poll_id=poll.id, user_id=uid))
+    db.commit()
+    db.close()
+    return Session
+
+
+# ---------------------------
+# Legacy path (as get_polls was, + FastAPI's response_model serialization)
+# ---------------------------
+POLL_LIST = TypeAdapter(list[schemas.Poll])
+
+
+def legacy_feed(db):
+    result = []
+    for poll in db.query(models.Poll).all():
+        options_data = []
+        for opt in poll.options:
+            vote_count = db.query(models.Vote).filter(models.Vote.option_id == opt.id).count()
+            options_data.append({"id": opt.id, "poll_id": opt.poll_id, "text": opt.text, "votes": vote_count})
+        like_count = db.query(models.Like).filter(models.Like.poll_id == poll.id).count()
+        result.append({
+            "id": poll.id, "title": poll.title, "description": poll.description,
+            "created_at": poll.created_at, "created_by": poll.created_by,
+            "likes_count": like_count, "options": options_data,
+        })
+    return POLL_LIST.dump_json(POLL_LIST.validate_python(result), by_alias=True)
+
+
+# ---------------------------
+# Batched ORM path (no N+1, still ORM objects + re-validation)
+# ---------------------------
+def batched_feed(db):
+    votes = dict(
+        db.query(models.Vote.option_id, func.count(models.Vote.id))
+        .group_by(models.Vote.option_id)
+        .all()
+    )
+    likes = dict(
+        db.query(models.Like.poll_id, func.count(models.Like.id))
+        .group_by(models.Like.poll_id)
+        .all()
+    )
+    result = [
+        {
+            "id": poll.id, "title": poll.title, "description": poll.description,
+            "created_at": poll.created_at, "created_by": poll.created_by,
+            "likes_count": likes.get(poll.id, 0),
+            "options": [
+                {"id": opt.id, "poll_id": opt.poll_id, "text": opt.text, "votes": votes.get(opt.id, 0)}
+                for opt in poll.options
+            ],
+        }
+        for poll in db.query(models.Poll).options(selectinload(models.Poll.options)).all()
+    ]
+    return POLL_LIST.dump_json(POLL_LIST.validate_python(result), by_alias=True)
+
+
+def lean_feed(db):
+    return polls._json_response(polls._poll_rows(db)).body
+
+
+def measure(label, fn, Session):
+    db = Session()
+    started, cpu = time.perf_counter(), time.process_time()
+    body = fn(db)
+    wall, cpu = time.perf_counter() - started, time.process_time() - cpu
+    db.close()
+
+    db = Session()
+    tracemalloc.start()
+    fn(db)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    db.close()
+
+    print(
+        f"{label:<8} wall={wall * 1000:9.1f} ms  cpu/poll={cpu / POLLS * 1e6:8.1f} µs  "
+        f"peak alloc/poll={peak / POLLS:8.0f} B  body={len(body) / 1024:.0f} KiB"
+    )
+    return body
+
+
+if __name__ == "__main__":
+    print(f"seeding {POLLS} polls × {OPTIONS} options …")
+    Session = seed()
+    bodies = {}
+    if LEGACY:
+        bodies["legacy"] = measure("legacy", legacy_feed, Session)
+    bodies["batched"] = measure("batched", batched_feed, Session)
+    bodies["lean"] = measure("lean", lean_feed, Session)
+
+    import json
+    key = lambda p: p["id"]
+    payloads = [sorted(json.loads(body), key=key) for body in bodies.values()]
+    assert all(p == payloads[0] for p in payloads), "payloads differ"
+    print("payloads identical ✅")
@@ -0,0 +1,50 @@
+# benchmarks/bench_rate_limit.py
+"""
+Rate limiter decision latency.
+
+    python -m benchmarks.bench_rate_limit            # in-process buckets
+    REDIS_URL=redis://localhost:6379 python -m benchmarks.bench_rate_limit
+"""
+import asyncio
+import statistics
+import time
+
+from app.utils import rate_limit
+
+N = 20_000
+
+
+def report(label, samples):
+    samples.sort()
+    print(
+        f"{label:<22} n={len(samples):>6}  "
+        f"p50={samples[len(samples) // 2] * 1e6:8.2f}µs  "
+        f"p99={samples[int(len(samples) * 0.99)] * 1e6:8.2f}µs  "
+        f"mean={statistics.mean(samples) * 1e6:8.2f}µs"
+    )
+
+
+def bench_local():
+    capacity, rate = rate_limit.parse_limit("30/60")
+    samples = []
+    for i in range(N):
+        key = f"rl:bench:u:{i % 1000}"
+        t0 = time.perf_counter()
+        rate_limit._local_take(key, capacity, rate)
+        samples.append(time.perf_counter() - t0)
+    report("local allow/deny", samples)
+
+
+async def bench_check():
+    capacity, rate = rate_limit.parse_limit("30/60")
+    samples = []
+    for i in range(N // 10):
+        t0 = time.perf_counter()
+        await rate_limit.check(f"rl:bench:u:{i % 100}", capacity, rate)
+        samples.append(time.perf_counter() - t0)
+    report("check() end-to-end", samples)
+
+
+if __name__ == "__main__":
+    bench_local()
+    asyncio.run(bench_check())
@@ -0,0 +1,97 @@
+# benchmarks/bench_startup.py
+"""
+Cold-start cost of a worker.
+
+    python -m benchmarks.bench_startup
+
+1. Import time of `app.main`, per module (python -X importtime).
+2. Time from spawning uvicorn to the first successful `GET /`, and to
+   `GET /health/ready` returning 200 (needs a reachable DB).
+"""
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+RUNS = int(os.getenv("STARTUP_RUNS", "3"))
+READY_TIMEOUT = float(os.getenv("STARTUP_READY_TIMEOUT", "15"))
+TOP = 15
+
+
+def import_times():
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-W", "ignore", "-c", "import app.main"],
+        capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        parts = [p.strip() for p in line[len("import time:"):].split("|")]
+        rows.append((parts[2], int(parts[0]), int(parts[1])))
+    return rows
+
+
+def report_imports():
+    rows = import_times()
+    total = next(cum for name, _, cum in rows if name == "app.main")
+    print(f"import app.main: {total / 1000:.1f} ms")
+
+    print("\napp modules (cumulative ms):")
+    for name, _, cum in rows:
+        if name.startswith("app"):
+            print(f"  {name:<32} {cum / 1000:8.1f}")
+
+    print(f"\ntop {TOP} top-level packages (cumulative ms):")
+    top_level = {}
+    for name, _, cum in rows:
+        if not name.startswith("app") and "." not in name:
+            top_level[name] = max(top_level.get(name, 0), cum)
+    for name, cum in sorted(top_level.items(), key=lambda kv: -kv[1])[:TOP]:
+        print(f"  {name:<32} {cum / 1000:8.1f}")
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for(url, deadline):
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as resp:
+                if resp.status == 200:
+                    return time.perf_counter()
+        except (urllib.error.URLError, ConnectionError, OSError):
+            time.sleep(0.005)
+    return None
+
+
+def report_first_request():
+    print(f"\nuvicorn cold start ({RUNS} runs):")
+    for _ in range(RUNS):
+        port = free_port()
+        started = time.perf_counter()
+        proc = subprocess.Popen(
+            [sys.executable, "-W", "ignore", "-m", "uvicorn", "app.main:app", "--port", str(port)],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            deadline = started + READY_TIMEOUT
+            first = wait_for(f"http://127.0.0.1:{port}/", deadline)
+            ready = wait_for(f"http://127.0.0.1:{port}/health/ready", deadline)
+        finally:
+            proc.terminate()
+            proc.wait()
+
+        fmt = lambda t: f"{(t - started) * 1000:7.1f} ms" if t else "   timeout"
+        print(f"  first request {fmt(first)}   ready {fmt(ready)}")
+
+
+if __name__ == "__main__":
+    report_imports()
+    report_first_request()
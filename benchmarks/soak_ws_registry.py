@@ -0,0 +1,193 @@
+# benchmarks/soak_ws_registry.py
+"""
+Soaks for the WebSocket handlers.
+
+churn (default): connect/disconnect cycles against fake sockets, in-memory.
+Memory should stay flat and the registries should end empty.
+
+held: a real uvicorn server with a short ping interval, healthy clients plus
+"silent" ones that finish the handshake and then never read (half-open).
+Connections are held past several ping intervals; the silent ones must be
+reaped, and every healthy one must still receive broadcasts — and nothing
+else. Goes through Redis when REDIS_URL is set, else the local fan-out.
+
+    python -m benchmarks.soak_ws_registry            # 1M cycles
+    SOAK_CYCLES=100000 python -m benchmarks.soak_ws_registry
+    python -m benchmarks.soak_ws_registry held       # 200 healthy + 50 silent
+    SOAK_HEALTHY=1000 SOAK_SILENT=200 python -m benchmarks.soak_ws_registry held
+"""
+import asyncio
+import contextlib
+import gc
+import io
+import json
+import os
+import socket
+import time
+import tracemalloc
+
+from app.routes import polls_ws
+
+CYCLES = int(os.getenv("SOAK_CYCLES", "1000000"))
+CHECKPOINTS = 10
+
+HEALTHY = int(os.getenv("SOAK_HEALTHY", "200"))
+SILENT = int(os.getenv("SOAK_SILENT", "50"))
+PING = float(os.getenv("SOAK_PING", "0.5"))  # uvicorn ping interval and timeout
+
+
+class FakeWebSocket:
+    """Just enough of starlette's WebSocket: the client hangs up immediately."""
+
+    async def accept(self):
+        pass
+
+    async def receive(self):
+        return {"type": "websocket.disconnect", "code": 1000}
+
+    async def send_json(self, data):
+        pass
+
+    async def send_text(self, data):
+        pass
+
+    async def close(self):
+        pass
+
+
+async def _noop(*args, **kwargs):
+    pass
+
+
+def _patch_snapshots():
+    # Initial-state snapshots hit the DB; they are not what is being measured
+    polls_ws._send_snapshot = _noop
+
+
+def _registered() -> int:
+    return len(polls_ws.global_connections) + sum(map(len, polls_ws.active_connections.values()))
+
+
+async def _wait_for(predicate, timeout: float, what: str):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError(f"timed out waiting for {what} (registered={_registered()})")
+        await asyncio.sleep(0.05)
+
+
+async def soak():
+    _patch_snapshots()
+
+    step = max(1, CYCLES // CHECKPOINTS)
+    poll_ids = [f"poll-{i}" for i in range(100)]
+    tracemalloc.start()
+    baseline = None
+    start = time.perf_counter()
+
+    for i in range(CYCLES):
+        if i % 2:
+            await polls_ws.websocket_poll_updates(FakeWebSocket(), poll_ids[i % 100])
+        else:
+            await polls_ws.websocket_all_polls(FakeWebSocket())
+
+        if (i + 1) % step == 0:
+            gc.collect()
+            current, _ = tracemalloc.get_traced_memory()
+            baseline = baseline or current
+            print(
+                f"{i + 1:>9} cycles  traced={current / 1024:9.1f} KiB  "
+                f"Δ={(current - baseline) / 1024:+8.1f} KiB  "
+                f"registry={len(polls_ws.active_connections)}/{len(polls_ws.global_connections)}",
+                file=OUT,
+            )
+
+    elapsed = time.perf_counter() - start
+    print(f"{CYCLES} cycles in {elapsed:.1f}s ({elapsed / CYCLES * 1e6:.1f} µs/cycle)", file=OUT)
+    assert not polls_ws.active_connections and not polls_ws.global_connections
+
+
+async def _silent_client(port: int, path: str):
+    """Complete the upgrade, then never read again: pings go unanswered."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(
+        f"GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nUpgrade: websocket\r\n"
+        "Connection: Upgrade\r\nSec-WebSocket-Key: c29hay1zaWxlbnQtY2xpIQ==\r\n"
+        "Sec-WebSocket-Version: 13\r\n\r\n".encode()
+    )
+    status = await reader.readuntil(b"\r\n\r\n")
+    assert status.startswith(b"HTTP/1.1 101"), status
+    return writer
+
+
+async def soak_held():
+    import uvicorn
+    from fastapi import FastAPI
+    from websockets.asyncio.client import connect
+
+    _patch_snapshots()
+    app = FastAPI()
+    app.include_router(polls_ws.router)
+
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    server = uvicorn.Server(
+        uvicorn.Config(app, ws_ping_interval=PING, ws_ping_timeout=PING, log_level="warning")
+    )
+    serving = asyncio.create_task(server.serve(sockets=[sock]))
+    await _wait_for(lambda: server.started, 10, "server start")
+
+    paths = ["/ws/polls"] + [f"/ws/polls/poll-{i}" for i in range(10)]
+    healthy = [
+        await connect(f"ws://127.0.0.1:{port}{paths[i % len(paths)]}", open_timeout=30)
+        for i in range(HEALTHY)
+    ]
+    silent = [await _silent_client(port, paths[i % len(paths)]) for i in range(SILENT)]
+    await _wait_for(lambda: _registered() == HEALTHY + SILENT, 30, "all connections to register")
+    print(f"{HEALTHY} healthy + {SILENT} silent connected", file=OUT)
+
+    # Hold past several ping rounds: only the silent sockets may go
+    hold = 4 * 2 * PING
+    start = time.monotonic()
+    await asyncio.sleep(hold)
+    await _wait_for(lambda: _registered() == HEALTHY, 10 * PING, "silent sockets to be reaped")
+    print(f"held {hold:.1f}s: registry={_registered()} (silent reaped in {time.monotonic() - start:.1f}s)", file=OUT)
+
+    # Every healthy socket gets the broadcast for its channel, and nothing before it
+    sent = {"/ws/polls": {"type": "new_poll", "id": "soak"}}
+    for path in paths[1:]:
+        sent[path] = {"type": "like_update", "poll_id": path.rsplit("/", 1)[1], "likes": 1}
+    await polls_ws.broadcast_global(sent["/ws/polls"])
+    for path in paths[1:]:
+        message = sent[path]
+        if await polls_ws.get_redis():
+            polls_ws.redis_manager.publish(f"poll:{message['poll_id']}", json.dumps(message))
+        else:
+            await polls_ws._send_local(polls_ws.active_connections[message["poll_id"]], message)
+
+    for i, ws in enumerate(healthy):
+        received = json.loads(await asyncio.wait_for(ws.recv(), 10))
+        assert received == sent[paths[i % len(paths)]], received
+    print(f"{HEALTHY} healthy sockets received their broadcast", file=OUT)
+
+    for ws in healthy:
+        await ws.close()
+    for writer in silent:
+        writer.close()
+    await _wait_for(lambda: _registered() == 0, 10, "registry to drain")
+    assert not polls_ws.active_connections and not polls_ws.global_connections
+
+    server.should_exit = True
+    await serving
+    await polls_ws.redis_manager.close()
+
+
+if __name__ == "__main__":
+    import sys
+
+    OUT = sys.stdout
+    with contextlib.redirect_stdout(io.StringIO()) as sink:
+        # Silence the per-connection prints, keep the buffer from growing
+        sink.write = lambda s: len(s)
+        asyncio.run(soak_held() if sys.argv[1:] == ["held"] else soak())
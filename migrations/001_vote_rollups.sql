@@ -0,0 +1,17 @@
+-- Vote rollups (pre-aggregated per-option vote counts per minute/hour/day)
+-- Must exist before deploying the code that writes to it from cast_vote:
+--   psql "$DATABASE_URL" -f migrations/001_vote_rollups.sql
+--   python -m app.utils.rollups          # backfill from existing votes
+
+CREATE TABLE IF NOT EXISTS vote_rollups (
+    id           SERIAL PRIMARY KEY,
+    poll_id      UUID NOT NULL REFERENCES polls(id) ON DELETE CASCADE,
+    option_id    UUID NOT NULL REFERENCES options(id) ON DELETE CASCADE,
+    resolution   TEXT NOT NULL,
+    bucket_start TIMESTAMPTZ NOT NULL,
+    count        INTEGER NOT NULL DEFAULT 0,
+    CONSTRAINT uq_vote_rollup_bucket UNIQUE (option_id, resolution, bucket_start)
+);
+
+CREATE INDEX IF NOT EXISTS ix_vote_rollups_poll_resolution_bucket
+    ON vote_rollups (poll_id, resolution, bucket_start);
@@ -3,5 +3,11 @@ set -e
 
 python3 -m pip install --upgrade pip
 python3 -m pip install -r requirements.txt
-python3 -m uvicorn app.main:app --host 0.0.0.0 --port 8000
+# Trust X-Forwarded-For only from the proxy in front of us (set FORWARDED_ALLOW_IPS
+# to its address, or "*" when the app is reachable through the proxy alone)
+# WebSocket ping frames every WS_PING_INTERVAL s; sockets that don't pong within
+# WS_PING_TIMEOUT s are closed, so half-open connections leave the registry
+python3 -m uvicorn app.main:app --host 0.0.0.0 --port 8000 \
+    --proxy-headers --forwarded-allow-ips "${FORWARDED_ALLOW_IPS:-127.0.0.1}" \
+    --ws-ping-interval "${WS_PING_INTERVAL:-20}" --ws-ping-timeout "${WS_PING_TIMEOUT:-20}"
 
@@ -0,0 +1,120 @@
+# tests/test_rate_limit.py
+import asyncio
+
+import pytest
+from starlette.requests import Request
+
+from app.utils import rate_limit
+
+
+@pytest.fixture(autouse=True)
+def clean_buckets():
+    rate_limit._local_buckets.clear()
+    yield
+    rate_limit._local_buckets.clear()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: now[0])
+    return now
+
+
+def make_request(ip="1.2.3.4", headers=None, body=b""):
+    raw = [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    return Request({"type": "http", "method": "POST", "headers": raw, "client": (ip, 1234)}, receive)
+
+
+# ---------------------------
+# parse_limit / get_limit
+# ---------------------------
+def test_parse_limit():
+    assert rate_limit.parse_limit("30/60") == (30, 0.5)
+    assert rate_limit.parse_limit("10/1") == (10, 10.0)
+
+
+def test_get_limit_env_override(monkeypatch):
+    monkeypatch.setenv("RATE_LIMIT_VOTE_USER", "5/10")
+    assert rate_limit.get_limit("vote", "user", "20/60") == (5, 0.5)
+    assert rate_limit.get_limit("vote", "ip", "120/60") == (120, 2.0)
+
+
+# ---------------------------
+# In-process token bucket
+# ---------------------------
+def test_local_take_denies_when_empty(clock):
+    assert rate_limit._local_take("k", 2, 0.5) == (True, 0.0)
+    assert rate_limit._local_take("k", 2, 0.5) == (True, 0.0)
+    allowed, retry_after = rate_limit._local_take("k", 2, 0.5)
+    assert not allowed
+    assert retry_after == pytest.approx(2.0)
+
+
+def test_local_take_refills_over_time(clock):
+    for _ in range(2):
+        rate_limit._local_take("k", 2, 0.5)
+    assert not rate_limit._local_take("k", 2, 0.5)[0]
+
+    clock[0] += 2.0  # one token back at 0.5/s
+    assert rate_limit._local_take("k", 2, 0.5) == (True, 0.0)
+    assert not rate_limit._local_take("k", 2, 0.5)[0]
+
+
+def test_local_take_caps_at_capacity(clock):
+    rate_limit._local_take("k", 2, 0.5)
+    clock[0] += 3600
+    results = [rate_limit._local_take("k", 2, 0.5)[0] for _ in range(3)]
+    assert results == [True, True, False]
+
+
+def test_local_buckets_are_independent(clock):
+    rate_limit._local_take("a", 1, 1.0)
+    assert not rate_limit._local_take("a", 1, 1.0)[0]
+    assert rate_limit._local_take("b", 1, 1.0)[0]
+
+
+# ---------------------------
+# Bucket identity
+# ---------------------------
+def test_client_ip_ignores_forwarded_header():
+    request = make_request(ip="10.0.0.1", headers={"X-Forwarded-For": "6.6.6.6"})
+    assert rate_limit.client_ip(request) == "10.0.0.1"
+
+
+def test_identity_user_falls_back_to_ip_with_distinct_key():
+    request = make_request(ip="1.2.3.4")
+    assert asyncio.run(rate_limit._identity(request, "ip")) == "1.2.3.4"
+    assert asyncio.run(rate_limit._identity(request, "user")) == "ip:1.2.3.4"
+
+
+def test_identity_username_is_scoped_to_client_ip():
+    body = b'{"username": "alice", "password": "x"}'
+    attacker = asyncio.run(rate_limit._identity(make_request("6.6.6.6", body=body), "username"))
+    owner = asyncio.run(rate_limit._identity(make_request("1.2.3.4", body=body), "username"))
+    assert attacker == "n:alice:ip:6.6.6.6"
+    assert attacker != owner
+
+
+# ---------------------------
+# Redis token bucket (Lua)
+# ---------------------------
+def test_redis_take_matches_local_semantics():
+    pytest.importorskip("lupa")
+    fakeredis = pytest.importorskip("fakeredis")
+
+    async def run():
+        client = fakeredis.FakeAsyncRedis(decode_responses=True)
+        results = [await rate_limit._redis_take(client, "rl:test", 2, 0.5) for _ in range(3)]
+        ttl = await client.ttl("rl:test")
+        await client.aclose()
+        return results, ttl
+
+    results, ttl = asyncio.run(run())
+    assert [allowed for allowed, _ in results] == [True, True, False]
+    assert results[2][1] == pytest.approx(2.0, abs=0.1)
+    assert 0 < ttl <= 5  # capacity / rate + 1
@@ -0,0 +1,220 @@
+# tests/test_redis_client.py
+import asyncio
+
+import pytest
+
+from app.utils import redis_client
+from app.utils.redis_client import RedisManager
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def manager(server, monkeypatch):
+    m = RedisManager("redis://fake")
+    monkeypatch.setattr(
+        m, "_build_client",
+        lambda max_connections=None: fakeredis.FakeAsyncRedis(server=server, decode_responses=True),
+    )
+    return m
+
+
+async def wait_until(predicate, timeout=5.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not predicate():
+        assert loop.time() < deadline, "condition not reached"
+        await asyncio.sleep(0.01)
+
+
+# ---------------------------
+# Circuit breaker
+# ---------------------------
+def test_disabled_without_url():
+    m = RedisManager(None)
+    assert m.state == "disabled"
+    assert asyncio.run(m.get()) is None
+    m.publish("c", "x")
+    assert m.stats()["buffered"] == 0
+
+
+def test_trip_backs_off_exponentially_up_to_the_cap(monkeypatch):
+    monkeypatch.setattr(redis_client.time, "monotonic", lambda: 100.0)
+    monkeypatch.setattr(redis_client.random, "uniform", lambda a, b: b)  # no jitter
+    monkeypatch.setattr(redis_client, "REDIS_BACKOFF_MAX", 4.0)
+    m = RedisManager("redis://fake")
+
+    delays = []
+    for _ in range(6):
+        m._trip(ConnectionError("down"))
+        delays.append(m.next_attempt - 100.0)
+
+    assert m.state == "open"
+    assert m.failures == 6
+    assert m.last_error == "down"
+    assert delays == [0.5, 1.0, 2.0, 4.0, 4.0, 4.0]
+
+
+def test_jitter_stays_within_half_to_full_backoff(monkeypatch):
+    monkeypatch.setattr(redis_client.time, "monotonic", lambda: 0.0)
+    m = RedisManager("redis://fake")
+    for _ in range(50):
+        m.failures = 2
+        m._trip(ConnectionError("down"))  # third failure → 2s backoff
+        assert 1.0 <= m.next_attempt <= 2.0
+
+
+def test_pool_exhaustion_does_not_open_the_circuit():
+    from redis.exceptions import MaxConnectionsError
+
+    async def run():
+        m = RedisManager("redis://fake")
+        m.state = "connected"
+        m.mark_failure(MaxConnectionsError("Too many connections"))
+        return m
+
+    m = asyncio.run(run())
+    assert m.state == "connected"
+    assert m.failures == 0
+    assert m.stats()["pool_exhausted"] == 1
+
+
+def test_get_never_waits_and_probes_in_background(manager, server):
+    async def run():
+        server.connected = False
+        assert await manager.get() is None  # schedules a probe, returns at once
+        await wait_until(lambda: manager.failures >= 1)
+        assert manager.state == "open"
+        assert await manager.get() is None
+
+        server.connected = True
+        manager.next_attempt = 0  # skip the remaining backoff
+        await wait_until(lambda: manager.state == "connected")
+        client = await manager.get()
+        assert await client.ping()
+        await manager.close()
+
+    asyncio.run(run())
+    assert manager.reconnects == 1
+    assert manager.failures == 0
+    assert manager.last_error is None
+
+
+def test_failed_op_trips_and_recovers(manager, server):
+    async def run():
+        assert await manager.probe()
+        server.connected = False
+        manager.mark_failure(ConnectionError("lost"))
+        assert manager.state == "open"
+        assert await manager.get() is None
+
+        server.connected = True
+        manager.next_attempt = 0
+        await wait_until(lambda: manager.state == "connected")
+        await manager.close()
+
+    asyncio.run(run())
+    assert manager.reconnects == 1
+
+
+# ---------------------------
+# Buffered publish
+# ---------------------------
+def test_publish_keeps_newest_snapshot_per_key_and_every_event():
+    async def run():
+        m = RedisManager("redis://fake")
+        m.state, m.next_attempt = "open", float("inf")  # hold everything in the buffer
+        m.publish("poll:1", "votes-1", key="poll:1:votes")
+        m.publish("polls:global", "new-poll-a")
+        m.publish("poll:1", "likes-1", key="poll:1:likes")
+        m.publish("poll:1", "votes-2", key="poll:1:votes")
+        m.publish("polls:global", "new-poll-b")
+        pending = list(m._buffer.values())
+        await m.close()
+        return pending
+
+    assert asyncio.run(run()) == [
+        ("polls:global", "new-poll-a"),
+        ("poll:1", "likes-1"),
+        ("poll:1", "votes-2"),
+        ("polls:global", "new-poll-b"),
+    ]
+
+
+def test_buffer_is_bounded(monkeypatch):
+    monkeypatch.setattr(redis_client, "REDIS_PUBLISH_BUFFER", 3)
+
+    async def run():
+        m = RedisManager("redis://fake")
+        m.state, m.next_attempt = "open", float("inf")
+        for i in range(5):
+            m.publish("polls:global", f"e{i}")
+        pending = [message for _, message in m._buffer.values()]
+        await m.close()
+        return m, pending
+
+    m, pending = asyncio.run(run())
+    assert pending == ["e2", "e3", "e4"]
+    assert m.dropped == 2
+
+
+def test_buffer_flushes_after_reconnect(manager, server):
+    async def run():
+        listener = fakeredis.FakeAsyncRedis(server=server, decode_responses=True).pubsub()
+        await listener.subscribe("poll:1")
+        await listener.get_message(timeout=1)  # subscribe confirmation
+
+        server.connected = False
+        manager.mark_failure(ConnectionError("down"))
+        manager.publish("poll:1", "votes-1", key="poll:1:votes")
+        manager.publish("poll:1", "votes-2", key="poll:1:votes")
+
+        server.connected = True
+        manager.next_attempt = 0
+        await wait_until(lambda: manager.state == "connected" and not manager._buffer)
+
+        received = []
+        while (message := await listener.get_message(timeout=0.2)) is not None:
+            received.append(message["data"])
+        await listener.aclose()
+        await manager.close()
+        return received
+
+    assert asyncio.run(run()) == ["votes-2"]
+
+
+# ---------------------------
+# Shared subscription
+# ---------------------------
+def test_shared_subscription_is_refcounted(manager):
+    async def run():
+        received = []
+
+        async def handler(data):
+            received.append(data)
+
+        await manager.subscribe("poll:1", handler)
+        await manager.subscribe("poll:1", handler)
+        await wait_until(lambda: "poll:1" in manager._subscribed)
+
+        manager.publish("poll:1", "a")
+        await wait_until(lambda: received == ["a"])
+
+        await manager.unsubscribe("poll:1")  # one local subscriber left
+        manager.publish("poll:1", "b")
+        await wait_until(lambda: received == ["a", "b"])
+
+        await manager.unsubscribe("poll:1")
+        assert "poll:1" not in manager._subscribed
+        manager.publish("poll:1", "c")
+        await asyncio.sleep(0.3)
+        await manager.close()
+        return received
+
+    assert asyncio.run(run()) == ["a", "b"]
+    assert manager.stats()["channels"] == 0
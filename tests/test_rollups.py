@@ -0,0 +1,123 @@
+# tests/test_rollups.py
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import models
+from app.utils import rollups
+
+UTC = timezone.utc
+
+
+# ---------------------------
+# truncate
+# ---------------------------
+@pytest.mark.parametrize(
+    "resolution, expected",
+    [
+        ("minute", datetime(2024, 3, 10, 23, 59, tzinfo=UTC)),
+        ("hour", datetime(2024, 3, 10, 23, 0, tzinfo=UTC)),
+        ("day", datetime(2024, 3, 10, 0, 0, tzinfo=UTC)),
+    ],
+)
+def test_truncate_last_instant_stays_in_bucket(resolution, expected):
+    ts = datetime(2024, 3, 10, 23, 59, 59, 999999, tzinfo=UTC)
+    assert rollups.truncate(ts, resolution) == expected
+
+
+@pytest.mark.parametrize("resolution", list(rollups.RESOLUTIONS))
+def test_truncate_bucket_start_is_fixed_point(resolution):
+    start = datetime(2024, 3, 11, 0, 0, tzinfo=UTC)
+    assert rollups.truncate(start, resolution) == start
+    assert rollups.truncate(start - timedelta(microseconds=1), resolution) < start
+
+
+def test_truncate_converts_to_utc():
+    # 01:30 at +02:00 is 23:30 UTC the previous day
+    ts = datetime(2024, 3, 11, 1, 30, tzinfo=timezone(timedelta(hours=2)))
+    assert rollups.truncate(ts, "day") == datetime(2024, 3, 10, tzinfo=UTC)
+    assert rollups.truncate(ts, "hour") == datetime(2024, 3, 10, 23, tzinfo=UTC)
+
+
+def test_truncate_treats_naive_as_utc():
+    assert rollups.truncate(datetime(2024, 3, 10, 12, 34, 56), "minute") == datetime(
+        2024, 3, 10, 12, 34, tzinfo=UTC
+    )
+
+
+# ---------------------------
+# get_history
+# ---------------------------
+@pytest.fixture
+def db():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    models.Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def seed_poll(db):
+    poll = models.Poll(id=uuid.uuid4(), title="Poll", description="", created_by="u0", likes_count=0)
+    options = [models.Option(id=uuid.uuid4(), poll_id=poll.id, text=t) for t in ("A", "B", "C")]
+    db.add(poll)
+    db.add_all(options)
+    db.commit()
+    return poll, options
+
+
+def add_rollup(db, poll, option, bucket_start, count, resolution="hour"):
+    db.add(
+        models.VoteRollup(
+            poll_id=poll.id, option_id=option.id, resolution=resolution,
+            bucket_start=bucket_start, count=count,
+        )
+    )
+
+
+def test_get_history_aligns_counts_to_shared_buckets(db):
+    poll, (a, b, c) = seed_poll(db)
+    now = rollups.truncate(datetime.now(UTC), "hour")
+    h2, h1 = now - timedelta(hours=2), now - timedelta(hours=1)
+    add_rollup(db, poll, a, h2, 3)
+    add_rollup(db, poll, b, h1, 5)
+    add_rollup(db, poll, a, now, 1)
+    add_rollup(db, poll, b, now, 2)
+    add_rollup(db, poll, a, now, 9, resolution="day")  # other resolutions ignored
+    db.commit()
+
+    history = rollups.get_history(db, poll.id, "hour", limit=24)
+
+    buckets = [datetime.fromisoformat(b).replace(tzinfo=None) for b in history["buckets"]]
+    assert buckets == [t.replace(tzinfo=None) for t in (h2, h1, now)]
+    counts = {opt["text"]: opt["counts"] for opt in history["options"]}
+    # Every option has one count per bucket, zero where it got no votes
+    assert counts == {"A": [3, 0, 1], "B": [0, 5, 2], "C": [0, 0, 0]}
+
+
+def test_get_history_limit_drops_older_buckets(db):
+    poll, (a, _, _) = seed_poll(db)
+    now = rollups.truncate(datetime.now(UTC), "minute")
+    for i in range(5):
+        add_rollup(db, poll, a, now - timedelta(minutes=i), i + 1, resolution="minute")
+    db.commit()
+
+    history = rollups.get_history(db, poll.id, "minute", limit=3)
+
+    assert len(history["buckets"]) == 3
+    counts = {opt["text"]: opt["counts"] for opt in history["options"]}
+    assert counts["A"] == [3, 2, 1]  # oldest first, within the window
+
+
+def test_get_history_without_votes(db):
+    poll, _ = seed_poll(db)
+    history = rollups.get_history(db, poll.id, "day", limit=7)
+    assert history["buckets"] == []
+    assert [opt["counts"] for opt in history["options"]] == [[], [], []]